@@ -1,13 +1,40 @@
+import argparse
+import json
 import os
 import sys
 
 from dotenv import load_dotenv
 
-from src import gen_anim, gen_profile, gen_stats
+from src import profiling
 
+# Stage outputs, so each stage can run on its own
+STATS_FILE = os.path.join("cache", "stats.json")
+FRAMES_FILE = os.path.join("cache", "ascii_frames.json")
+
+STAGES = ("stats", "frames", "render", "all")
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def load_json(path, stage):
+    if not os.path.exists(path):
+        print(f"ERROR: {path} not found. Run the '{stage}' stage first.")
+        sys.exit(1)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_stats():
+    """
+    Fetches GitHub statistics and stores them in STATS_FILE. When the fetch
+    falls back to mock stats, the stats already in STATS_FILE are kept and used.
+    """
+    from src import gen_stats
 
-def run():
-    load_dotenv()
     github_token = os.getenv("GITHUB_TOKEN")
     github_username = os.getenv("GITHUB_USERNAME")
 
@@ -18,22 +45,118 @@ def run():
         print("ERROR: GITHUB_USERNAME environment variable is not set.")
         sys.exit(1)
 
-    try:
-        print(f"Fetching statistics for {github_username}...")
-        stats = gen_stats.get_github_stats(github_username, github_token)
+    print(f"Fetching statistics for {github_username}...")
+    stats = gen_stats.get_github_stats(github_username, github_token)
+    # get_github_stats returns mock_stats() when it could not fetch anything,
+    # which must not replace the last good stats on disk
+    if stats == gen_stats.mock_stats():
+        if os.path.exists(STATS_FILE):
+            print(f"WARN: Keeping previous statistics from {STATS_FILE}.")
+            return load_json(STATS_FILE, "stats")
+        print(f"WARN: Using mock statistics, {STATS_FILE} not written.")
+        return stats
+    save_json(STATS_FILE, stats)
+    return stats
+
+
+def run_frames(color=False):
+    """Converts the resource images to ASCII frames and stores them in FRAMES_FILE."""
+    from src import gen_anim
 
-        print("Generating ASCII slideshow from resources...")
-        ascii_frames = gen_anim.generate_ascii_slideshow(
-            "resources", new_width=50, charset="detailed", contrast=1.8, brightness=1.1
-        )
+    print("Generating ASCII slideshow from resources...")
+    ascii_frames = gen_anim.generate_ascii_slideshow(
+        "resources",
+        new_width=50,
+        charset="detailed",
+        contrast=1.8,
+        brightness=1.1,
+        color=color,
+    )
+    save_json(FRAMES_FILE, ascii_frames)
+    return ascii_frames
 
-        gen_profile.generate_svg("dark", stats, ascii_frames)
-        gen_profile.generate_svg("light", stats, ascii_frames)
+
+def run_render(stats=None, ascii_frames=None, minify=False, raster=False):
+    """
+    Renders the themed SVGs, loading stage outputs from disk when not given.
+    With minify, minified and precompressed variants are written next to them,
+    with raster, a PNG and an animated WebP of each.
+    """
+    from src import gen_profile
+
+    if stats is None:
+        stats = load_json(STATS_FILE, "stats")
+    if ascii_frames is None:
+        ascii_frames = load_json(FRAMES_FILE, "frames")
+
+    for theme_name in ("dark", "light"):
+        with profiling.stage(f"svg:{theme_name}"):
+            gen_profile.generate_svg(theme_name, stats, ascii_frames)
+        if minify:
+            from src import minify as svg_minify
+
+            svg_minify.optimize_svg(gen_profile.THEMES[theme_name]["filename"])
+        if raster:
+            from src import gen_raster
+
+            gen_raster.generate_raster(
+                gen_profile.THEMES[theme_name]["filename"], animated=True
+            )
+
+
+def run(stage="all", color=False, minify=False, raster=False, profile=None):
+    # Before any lazy import, as several modules read their settings on import
+    load_dotenv()
+    try:
+        with profiling.session(profiling.parse_modes(profile)):
+            stats = None
+            ascii_frames = None
+            if stage in ("stats", "all"):
+                with profiling.stage("stats"):
+                    stats = run_stats()
+            if stage in ("frames", "all"):
+                with profiling.stage("frames"):
+                    ascii_frames = run_frames(color)
+            if stage in ("render", "all"):
+                run_render(stats, ascii_frames, minify, raster)
         print("\nSuccess: Profile statistics updated successfully.")
     except Exception as e:
         print(f"\nERROR: An unexpected error occurred: {e}")
         sys.exit(1)
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the GitHub profile SVGs.")
+    parser.add_argument(
+        "stage",
+        nargs="?",
+        default="all",
+        choices=STAGES,
+        help="stats: fetch GitHub stats, frames: build ASCII frames, "
+        "render: draw SVGs from cached stats and frames, all: everything (default)",
+    )
+    parser.add_argument(
+        "--color", action="store_true", help="keep per-character colors in ASCII frames"
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="also write minified .min.svg files with gzip/brotli siblings",
+    )
+    parser.add_argument(
+        "--raster",
+        action="store_true",
+        help="also write PNG and animated WebP versions (uses Pillow)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="MODES",
+        help="comma separated profiling modes: cpu, cprofile, memory "
+        "(default: PROFILE_MODE environment variable)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    run()
+    args = parse_args()
+    run(args.stage, args.color, args.minify, args.raster, args.profile)
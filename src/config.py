@@ -92,4 +92,7 @@ PROFILE_DATA = [
         ],
     },
     {"type": "complex_loc", "label": "Github.LOC"},
+    {"type": "spacer", "height": 15},
+    {"type": "heatmap"},
+    {"type": "languages"},
 ]
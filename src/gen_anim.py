@@ -1,3 +1,5 @@
+import hashlib
+import json
 import os
 
 from PIL import Image, ImageEnhance, ImageOps
@@ -12,19 +14,35 @@ ASCII_CHARS_BLOCKS = "█▓▒░ "
 # Supported image file extensions
 SUPPORTED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
 
+# Color mode quantizes each RGB channel to this many levels, giving a fixed
+# palette shared by all frames (4 levels = 64 colors)
+COLOR_LEVELS = 4
+
+# Per-image ASCII variants, keyed by image content and conversion settings
+FRAME_CACHE_DIR = os.path.join("cache", "frames")
+
 
 def image_to_ascii(
-    image_path, new_width=40, charset="simple", contrast=1.5, brightness=1.0
+    image_path,
+    new_width=40,
+    charset="simple",
+    contrast=1.5,
+    brightness=1.0,
+    color=False,
 ):
     """
     Converts a single image to a list of ASCII strings.
 
+    In color mode each line is instead a list of [text, "#rrggbb"] runs, where
+    adjacent cells sharing a quantized color are merged into one run.
+
     Args:
         image_path (str): Path to the image file.
         new_width (int): Target width of the ASCII art in characters.
         charset (str): Choice of "simple", "detailed", or "blocks".
         contrast (float): Contrast multiplier (1.0 = original).
         brightness (float): Brightness multiplier (1.0 = original).
+        color (bool): Keep a quantized color per character.
     """
     try:
         img = Image.open(image_path)
@@ -32,20 +50,79 @@ def image_to_ascii(
         print(f"Failed to open image {image_path}: {e}")
         return ["ERROR", "IMAGE", "FAIL"]
 
+    gray, cell_colors = prepare_image(img, new_width, contrast, brightness, color)
+    return map_to_ascii(gray, cell_colors, new_width, get_charset(charset))
+
+
+def image_to_ascii_variants(
+    image_path, variants, contrast=1.5, brightness=1.0, color=False
+):
+    """
+    Converts a single image to ASCII at several widths and charsets.
+
+    The image is decoded once. Each distinct width is scaled and enhanced once
+    from the decoded original, exactly as image_to_ascii does, and every charset
+    at that width is mapped from the same enhanced image. A variant therefore
+    does not depend on which other variants are requested with it.
+
+    Args:
+        variants (list): (new_width, charset) pairs.
+
+    Returns:
+        dict: variant_key(new_width, charset) -> list of ASCII lines.
+    """
+    try:
+        img = Image.open(image_path)
+        img.load()
+    except Exception as e:
+        print(f"Failed to open image {image_path}: {e}")
+        return {
+            variant_key(*variant): ["ERROR", "IMAGE", "FAIL"] for variant in variants
+        }
+
+    prepared = {}
+    result = {}
+    for new_width, charset in variants:
+        if new_width not in prepared:
+            prepared[new_width] = prepare_image(
+                img, new_width, contrast, brightness, color
+            )
+        gray, cell_colors = prepared[new_width]
+        result[variant_key(new_width, charset)] = map_to_ascii(
+            gray, cell_colors, new_width, get_charset(charset)
+        )
+    return result
+
+
+def variant_key(new_width, charset):
+    return f"{new_width}-{charset}"
+
+
+def get_charset(charset):
     if charset == "detailed":
-        chars = ASCII_CHARS_DETAILED
-    elif charset == "blocks":
-        chars = ASCII_CHARS_BLOCKS
-    else:
-        chars = ASCII_CHARS_SIMPLE
+        return ASCII_CHARS_DETAILED
+    if charset == "blocks":
+        return ASCII_CHARS_BLOCKS
+    return ASCII_CHARS_SIMPLE
+
+
+def prepare_image(img, new_width, contrast, brightness, color):
+    """
+    Scales and enhances an image for ASCII mapping.
 
+    Returns:
+        tuple: (enhanced grayscale image, quantized cell colors or None)
+    """
     # 1. Scaling (maintaining aspect ratio)
-    width, height = img.size
-    aspect_ratio = height / width
     # Monospaced fonts are roughly 2:1 height-to-width ratio, hence the 0.55 correction
+    aspect_ratio = img.height / img.width
     new_height = int(aspect_ratio * new_width * 0.55)
     img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
+    cell_colors = None
+    if color:
+        cell_colors = [quantize_color(pixel) for pixel in img.convert("RGB").getdata()]
+
     # 2. Convert to grayscale
     img = img.convert("L")
 
@@ -61,6 +138,11 @@ def image_to_ascii(
     # 4. Normalize histogram to use full 0-255 range
     img = ImageOps.autocontrast(img, cutoff=2)
 
+    return img, cell_colors
+
+
+def map_to_ascii(img, cell_colors, new_width, chars):
+    """Maps a prepared grayscale image to ASCII lines (color runs with cell_colors)."""
     # 5. Map pixels to ASCII characters
     pixels = list(img.getdata())
     num_chars = len(chars)
@@ -71,6 +153,15 @@ def image_to_ascii(
         char_index = int((pixel / 255) * (num_chars - 1))
         new_pixels.append(chars[char_index])
 
+    if cell_colors is not None:
+        return [
+            coalesce_color_runs(
+                new_pixels[index : index + new_width],
+                cell_colors[index : index + new_width],
+            )
+            for index in range(0, len(new_pixels), new_width)
+        ]
+
     ascii_image = [
         "".join(new_pixels[index : index + new_width])
         for index in range(0, len(new_pixels), new_width)
@@ -79,8 +170,34 @@ def image_to_ascii(
     return ascii_image
 
 
+def quantize_color(pixel):
+    """Snaps an (r, g, b) pixel to the shared COLOR_LEVELS palette as a hex string."""
+    step = 255 / (COLOR_LEVELS - 1)
+    r, g, b = (int(round(round(channel / step) * step)) for channel in pixel[:3])
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def coalesce_color_runs(chars, colors):
+    """
+    Merges adjacent characters with the same color into [text, color] runs.
+    Spaces have no visible fill, so they join the current run whatever their color.
+    """
+    runs = []
+    for char, cell_color in zip(chars, colors):
+        if runs and (char == " " or runs[-1][1] == cell_color):
+            runs[-1][0] += char
+        else:
+            runs.append([char, cell_color])
+    return runs
+
+
 def generate_ascii_slideshow(
-    resources_dir, new_width=40, charset="simple", contrast=1.5, brightness=1.0
+    resources_dir,
+    new_width=40,
+    charset="simple",
+    contrast=1.5,
+    brightness=1.0,
+    color=False,
 ):
     """
     Scans the resources directory and converts all images to ASCII frames.
@@ -99,7 +216,7 @@ def generate_ascii_slideshow(
             filepath = os.path.join(resources_dir, filename)
             print(f"Processing image to ASCII: {filename}...")
             ascii_art = image_to_ascii(
-                filepath, new_width, charset, contrast, brightness
+                filepath, new_width, charset, contrast, brightness, color
             )
             frames.append(ascii_art)
 
@@ -108,3 +225,84 @@ def generate_ascii_slideshow(
         return [["NO IMAGES", "FOUND", "IN RESOURCES"]]
 
     return frames
+
+
+def generate_ascii_pyramid(
+    resources_dir, variants, contrast=1.5, brightness=1.0, color=False, use_cache=True
+):
+    """
+    Converts all images in the resources directory to ASCII frames at several
+    widths and charsets, decoding each image at most once.
+
+    Results are cached per image in FRAME_CACHE_DIR, so images that did not
+    change are not decoded at all and only new variants are computed.
+
+    Args:
+        variants (list): (new_width, charset) pairs.
+
+    Returns:
+        dict: variant_key(new_width, charset) -> list of frames.
+    """
+    keys = [variant_key(*variant) for variant in variants]
+    pyramid = {key: [] for key in keys}
+
+    if not os.path.isdir(resources_dir):
+        print(f"Directory {resources_dir} does not exist. Creating placeholder.")
+        return {key: [["DIR", "NOT", "FOUND"]] for key in keys}
+
+    for filename in sorted(os.listdir(resources_dir)):
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            continue
+
+        filepath = os.path.join(resources_dir, filename)
+        cache_file = None
+        cached = {}
+        if use_cache:
+            cache_key = frame_cache_key(filepath, contrast, brightness, color)
+            cache_file = os.path.join(FRAME_CACHE_DIR, f"{cache_key}.json")
+            if os.path.exists(cache_file):
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+
+        missing = [variant for variant, key in zip(variants, keys) if key not in cached]
+        if missing:
+            print(f"Processing image to ASCII: {filename} ({len(missing)} variants)...")
+            cached.update(
+                image_to_ascii_variants(filepath, missing, contrast, brightness, color)
+            )
+            if cache_file:
+                os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+                with open(cache_file, "w", encoding="utf-8") as f:
+                    json.dump(cached, f, ensure_ascii=False)
+
+        for key in keys:
+            pyramid[key].append(cached[key])
+
+    if not any(pyramid.values()):
+        print("No images found in resources directory. Creating placeholder.")
+        return {key: [["NO IMAGES", "FOUND", "IN RESOURCES"]] for key in keys}
+
+    return pyramid
+
+
+def frame_cache_key(image_path, contrast, brightness, color):
+    """
+    Hashes the image bytes together with every setting that affects its frames,
+    including this module's source so conversion changes invalidate the cache.
+    """
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        digest.update(f.read())
+    with open(__file__, "rb") as f:
+        digest.update(f.read())
+    settings = [
+        contrast,
+        brightness,
+        color,
+        COLOR_LEVELS,
+        ASCII_CHARS_DETAILED,
+        ASCII_CHARS_SIMPLE,
+        ASCII_CHARS_BLOCKS,
+    ]
+    digest.update(json.dumps(settings).encode("utf-8"))
+    return digest.hexdigest()
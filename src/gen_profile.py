@@ -3,6 +3,15 @@ import os
 import svgwrite
 
 from .config import PROFILE_DATA
+from .widgets import (
+    get_widget,
+    load_fragment_cache,
+    render_item,
+    save_fragment_cache,
+)
+
+# Default display time of each slideshow frame, in seconds
+FRAME_DURATION = 5
 
 # Color configuration for themes
 THEMES = {
@@ -16,6 +25,7 @@ THEMES = {
         "plus": "#56d364",
         "minus": "#f85149",
         "ascii": "#8b949e",
+        "heat": ["#161b22", "#0e4429", "#006d32", "#26a641", "#39d353"],
         "filename": "assets/profile-dark.svg",
     },
     "light": {
@@ -28,14 +38,16 @@ THEMES = {
         "plus": "#1a7f37",
         "minus": "#cf222e",
         "ascii": "#57606a",
+        "heat": ["#ebedf0", "#9be9a8", "#40c463", "#30a14e", "#216e39"],
         "filename": "assets/profile-light.svg",
     },
 }
 
 
-def generate_svg(theme_name, stats_data, ascii_frames):
+def generate_svg(theme_name, stats_data, ascii_frames, frame_durations=None):
     """
     Generates an SVG file for the given theme, statistics, and ASCII animation frames.
+    frame_durations optionally gives the display time of each frame in seconds.
 
     The layout consists of:
     - Left side: Animated ASCII art (slideshow)
@@ -52,32 +64,38 @@ def generate_svg(theme_name, stats_data, ascii_frames):
     )
 
     # --- CSS ANIMATION FOR SLIDESHOW ---
+    # Lines shared by consecutive frames are emitted once, see build_line_spans
+    max_frame_lines = max(len(frame) for frame in ascii_frames) if ascii_frames else 0
+    line_height = 12
+    max_ascii_height = max_frame_lines * line_height
+
     num_frames = len(ascii_frames)
-    duration_per_frame = 5  # seconds
-    total_duration = num_frames * duration_per_frame
-    slideshow_css = ""
-
-    if num_frames > 1:
-        for i in range(num_frames):
-            anim_name = f"slide-anim-{i}"
-            start_pct = (i / num_frames) * 100
-            end_pct = ((i + 1) / num_frames) * 100
-
-            keyframes = f"@keyframes {anim_name} {{"
-            if i > 0:
-                keyframes += "0% { opacity: 0; }"
-            keyframes += f"{start_pct - 0.1:.1f}% {{ opacity: 0; }}"
-            keyframes += f"{start_pct:.1f}% {{ opacity: 1; }}"
-            keyframes += f"{end_pct - 0.1:.1f}% {{ opacity: 1; }}"
-            keyframes += f"{end_pct:.1f}% {{ opacity: 0; }}"
-            if i < num_frames - 1:
-                keyframes += "100% { opacity: 0; }"
-            keyframes += "}"
-
-            slideshow_css += keyframes + "\n"
-            slideshow_css += (
-                f".slide-{i} {{ animation: {anim_name} {total_duration}s infinite; }}\n"
-            )
+    if frame_durations is None:
+        frame_durations = [FRAME_DURATION] * num_frames
+    if len(frame_durations) != num_frames:
+        raise ValueError(
+            f"Got {len(frame_durations)} frame durations for {num_frames} frames"
+        )
+    spans = build_line_spans(ascii_frames, max_ascii_height, line_height)
+    slideshow_css, span_classes = build_timeline_css(spans, frame_durations)
+
+    # --- COLOR PALETTE (color ASCII frames) ---
+    # Runs reference a shared CSS class per color instead of inline fills
+    palette = {}
+    for frame in ascii_frames:
+        for line in frame:
+            if not isinstance(line, str):
+                for _, run_color in line:
+                    palette.setdefault(run_color, f"c{len(palette)}")
+    palette_css = "".join(
+        f".{class_name} {{ fill: {run_color}; }}\n"
+        for run_color, class_name in palette.items()
+    )
+
+    heat_css = "".join(
+        f".heat{level} {{ fill: {heat_color}; }}\n"
+        for level, heat_color in enumerate(theme["heat"])
+    )
 
     # --- CSS STYLES ---
     dwg.defs.add(
@@ -90,6 +108,8 @@ def generate_svg(theme_name, stats_data, ascii_frames):
         .plus {{ fill: {theme["plus"]}; font-weight: bold; }}
         .minus {{ fill: {theme["minus"]}; font-weight: bold; }}
         .ascii {{ fill: {theme["ascii"]}; font-size: 11px; white-space: pre; letter-spacing: 1px; }}
+        {heat_css}
+        {palette_css}
         {slideshow_css}
     """)
     )
@@ -100,218 +120,51 @@ def generate_svg(theme_name, stats_data, ascii_frames):
 
     # --- CALCULATE HEIGHT OF RIGHT COLUMN ---
     content_y = 20
-    row_height = 20
+    layout = {
+        "max_text_width": total_width - right_column_start - 20,
+        "row_height": 20,
+    }
 
-    right_column_height = 0
-    for item in PROFILE_DATA:
-        if item["type"] == "spacer":
-            right_column_height += item.get("height", 10)
-        elif item["type"] == "header":
-            right_column_height += row_height
-        elif item["type"] == "text":
-            char_width = 7
-            max_chars = int((total_width - right_column_start - 20) / char_width)
-            text_lines = len(item["text"]) // max_chars + 1
-            right_column_height += text_lines * row_height
-        elif item["type"] == "group":
-            right_column_height += len(item["items"]) * row_height
-        elif item["type"] == "complex_loc":
-            right_column_height += row_height
-        elif item["type"] == "two_column":
-            right_column_height += len(item["rows"]) * row_height
+    right_column_height = sum(
+        get_widget(item).measure(item, layout) for item in PROFILE_DATA
+    )
 
     final_height = max(right_column_height + content_y + 30, height)
 
     # --- LEFT SIDE (ASCII SLIDESHOW) ---
-    max_frame_lines = max(len(frame) for frame in ascii_frames) if ascii_frames else 0
-    line_height = 12
-    max_ascii_height = max_frame_lines * line_height
     group_y_offset = max(20, (final_height - max_ascii_height) // 2)
 
     slideshow_group = dwg.g(transform=f"translate(20, {group_y_offset})")
 
-    for i, frame in enumerate(ascii_frames):
-        frame_class = f"slide-{i}" if num_frames > 1 else ""
-        frame_style = "opacity: 1;" if i == 0 else "opacity: 0;"
-        if num_frames == 1:
-            frame_style = ""
-
-        frame_height = len(frame) * line_height
-        frame_y_offset = (max_ascii_height - frame_height) // 2
-
-        frame_group = dwg.g(
-            class_=frame_class,
-            style=frame_style,
-            transform=f"translate(0, {frame_y_offset})",
-        )
-
-        for line_idx, line in enumerate(frame):
-            frame_group.add(dwg.text(line, insert=(0, line_idx * 12), class_="ascii"))
+    for (y, line, _, _), line_class in zip(spans, span_classes):
+        if isinstance(line, str):
+            slideshow_group.add(dwg.text(line, insert=(0, y), class_=line_class))
+            continue
 
-        slideshow_group.add(frame_group)
+        line_text = dwg.text("", insert=(0, y), class_=line_class)
+        for run_text, run_color in line:
+            line_text.add(dwg.tspan(run_text, class_=palette[run_color]))
+        slideshow_group.add(line_text)
 
     dwg.add(slideshow_group)
 
     # --- RIGHT SIDE (TEXT RENDERER) ---
-    content_x = right_column_start
-    max_text_width = total_width - right_column_start - 20
-
-    stats_group = dwg.g(transform=f"translate({content_x}, {content_y})")
+    # Items without stats placeholders come from the fragment cache
+    stats_group = dwg.g(transform=f"translate({right_column_start}, {content_y})")
     current_y = 0
 
-    for item in PROFILE_DATA:
-        if item["type"] == "spacer":
-            current_y += item.get("height", 10)
-            continue
-
-        if item["type"] == "header":
-            base_text = item["text"].rstrip("-").rstrip()
-            char_width = 7
-            available_chars = int(max_text_width / char_width)
-            dashes_needed = available_chars - len(base_text) - 1
-            header_text = base_text + " " + ("-" * max(0, dashes_needed))
-            stats_group.add(
-                dwg.text(header_text, insert=(0, current_y), class_="header")
-            )
-            current_y += row_height
-            continue
-
-        if item["type"] == "text":
-            char_width = 7
-            dot_prefix = ". "
-            dot_prefix_width = len(dot_prefix) * char_width
-            max_chars = int((max_text_width - dot_prefix_width) / char_width)
-            text = item["text"]
-
-            if len(text) > max_chars:
-                lines = wrap_text(text, max_chars)
-            else:
-                lines = [text]
-
-            for i, line in enumerate(lines):
-                if i == 0:
-                    stats_group.add(
-                        dwg.text(dot_prefix, insert=(0, current_y), class_="dots")
-                    )
-                stats_group.add(
-                    dwg.text(
-                        line, insert=(dot_prefix_width, current_y), class_="header"
-                    )
-                )
-                current_y += row_height
-            continue
-
-        if item["type"] == "group":
-            char_width = 7
-            dot_prefix = ". "
-            dot_prefix_width = len(dot_prefix) * char_width
-
-            for key, raw_val in item["items"]:
-                val_text = raw_val.format(**stats_data)
-                stats_group.add(
-                    dwg.text(dot_prefix, insert=(0, current_y), class_="dots")
-                )
-                lines_used = draw_neofetch_row(
-                    dwg,
-                    stats_group,
-                    key,
-                    val_text,
-                    dot_prefix_width,
-                    current_y,
-                    max_text_width - dot_prefix_width,
-                    row_height,
-                )
-                current_y += row_height * lines_used
-            continue
+    fragments = load_fragment_cache()
+    used_keys = set()
 
-        if item["type"] == "two_column":
-            char_width = 7
-            half_width = max_text_width // 2 - 10
-            dot_prefix = ". "
-            dot_prefix_width = len(dot_prefix) * char_width
-
-            for row in item["rows"]:
-                left_key, left_val = row[0]
-                right_key, right_val = row[1]
-
-                left_val_text = left_val.format(**stats_data)
-                right_val_text = right_val.format(**stats_data)
-
-                stats_group.add(
-                    dwg.text(dot_prefix, insert=(0, current_y), class_="dots")
-                )
-
-                draw_two_col_item(
-                    dwg,
-                    stats_group,
-                    left_key,
-                    left_val_text,
-                    dot_prefix_width,
-                    current_y,
-                    half_width - dot_prefix_width,
-                    char_width,
-                )
-
-                stats_group.add(
-                    dwg.text("|", insert=(half_width + 5, current_y), class_="dots")
-                )
-
-                draw_two_col_item(
-                    dwg,
-                    stats_group,
-                    right_key,
-                    right_val_text,
-                    half_width + 20,
-                    current_y,
-                    half_width,
-                    char_width,
-                )
-
-                current_y += row_height
-            continue
+    for item in PROFILE_DATA:
+        element, item_height = render_item(
+            dwg, item, stats_data, layout, current_y, fragments, used_keys
+        )
+        if element is not None:
+            stats_group.add(element)
+        current_y += item_height
 
-        if item["type"] == "complex_loc":
-            key = item["label"]
-            total = stats_data.get("loc_total", "0")
-            add = stats_data.get("loc_add", "0")
-            dele = stats_data.get("loc_del", "0")
-
-            char_width = 7
-            dot_prefix = ". "
-            dot_prefix_width = len(dot_prefix) * char_width
-            key_pixel_width = (len(key) + 1) * char_width
-
-            value_text = f"{total} ( {add}, {dele} )"
-            val_pixel_width = len(value_text) * char_width
-            val_start_x = max_text_width - val_pixel_width
-
-            stats_group.add(dwg.text(dot_prefix, insert=(0, current_y), class_="dots"))
-
-            stats_group.add(
-                dwg.text(f"{key}:", insert=(dot_prefix_width, current_y), class_="key")
-            )
-
-            space_for_dots = val_start_x - dot_prefix_width - key_pixel_width - 5
-            if space_for_dots > 0:
-                num_dots = int(space_for_dots / char_width)
-                stats_group.add(
-                    dwg.text(
-                        "." * num_dots,
-                        insert=(dot_prefix_width + key_pixel_width, current_y),
-                        class_="dots",
-                    )
-                )
-
-            val_group = dwg.text("", insert=(val_start_x, current_y))
-            val_group.add(dwg.tspan(f"{total} "))
-            val_group.add(dwg.tspan("( "))
-            val_group.add(dwg.tspan(f"{add}", class_="plus"))
-            val_group.add(dwg.tspan(", "))
-            val_group.add(dwg.tspan(f"{dele}", class_="minus"))
-            val_group.add(dwg.tspan(" )"))
-            stats_group.add(val_group)
-
-            current_y += row_height
+    save_fragment_cache({key: fragments[key] for key in used_keys})
 
     dwg.add(stats_group)
 
@@ -323,85 +176,84 @@ def generate_svg(theme_name, stats_data, ascii_frames):
     print(f"Generated: {theme['filename']}")
 
 
-def draw_neofetch_row(dwg, group, key, value, x, y, max_width, row_height=20):
-    """Draws a key-value row with dots in between (neofetch style).
-    Returns the number of rows used (for text wrapping)."""
-    char_width = 7
-    key_pixel_width = (len(key) + 1) * char_width
-
-    available_width = max_width - key_pixel_width - 20
-    max_value_chars = int(available_width / char_width)
-
-    if len(value) > max_value_chars and max_value_chars > 0:
-        lines = wrap_text(value, max_value_chars)
-    else:
-        lines = [value]
-
-    group.add(dwg.text(f"{key}:", insert=(x, y), class_="key"))
-
-    first_line = lines[0]
-    val_pixel_width = len(first_line) * char_width
-    val_start_x = x + max_width - val_pixel_width
-    if val_start_x < x + key_pixel_width + 10:
-        val_start_x = x + key_pixel_width + 10
-
-    group.add(dwg.text(first_line, insert=(val_start_x, y)))
-
-    dot_start = x + key_pixel_width
-    space_for_dots = val_start_x - dot_start - 5
-    if space_for_dots > 0:
-        num_dots = int(space_for_dots / char_width)
-        group.add(dwg.text("." * num_dots, insert=(dot_start, y), class_="dots"))
+def build_line_spans(ascii_frames, max_ascii_height, line_height):
+    """
+    Delta-encodes the slideshow: returns (y, line, start_frame, end_frame) spans,
+    where a line that stays identical at the same position over consecutive
+    frames becomes a single span instead of one element per frame.
+    """
+    spans = []
+    open_spans = {}
 
-    for i, line in enumerate(lines[1:], start=1):
-        line_y = y + i * row_height
-        group.add(dwg.text(line, insert=(val_start_x, line_y)))
+    for i, frame in enumerate(ascii_frames):
+        frame_y_offset = (max_ascii_height - len(frame) * line_height) // 2
+        current = {
+            frame_y_offset + line_idx * line_height: line
+            for line_idx, line in enumerate(frame)
+        }
 
-    return len(lines)
+        for y in list(open_spans):
+            line, start = open_spans[y]
+            if current.get(y) != line:
+                spans.append((y, line, start, i))
+                del open_spans[y]
 
+        for y, line in current.items():
+            if y not in open_spans:
+                open_spans[y] = (line, i)
 
-def draw_two_col_item(dwg, group, key, value, x, y, width, char_width):
-    key_pixel_width = (len(key) + 1) * char_width
-    val_pixel_width = len(value) * char_width
+    for y, (line, start) in open_spans.items():
+        spans.append((y, line, start, len(ascii_frames)))
 
-    group.add(dwg.text(f"{key}:", insert=(x, y), class_="key"))
+    spans.sort(key=lambda span: (span[2], span[0]))
+    return spans
 
-    val_start_x = x + width - val_pixel_width
-    if val_start_x < x + key_pixel_width + 5:
-        val_start_x = x + key_pixel_width + 5
 
-    group.add(dwg.text(value, insert=(val_start_x, y)))
+def build_timeline_css(spans, frame_durations):
+    """
+    Builds the slideshow CSS and the class of every span.
 
-    space_for_dots = val_start_x - (x + key_pixel_width) - 3
-    if space_for_dots > 0:
-        num_dots = int(space_for_dots / char_width)
-        group.add(
-            dwg.text("." * num_dots, insert=(x + key_pixel_width, y), class_="dots")
+    Animated lines share the cycle length and timing in .anim. Keyframes are
+    shared by all spans visible for the same time (a single keyframe when frames
+    have equal durations and nothing is shared), and each starting frame gets
+    one animation-delay class. Lines of the first frame are visible by default,
+    so viewers without CSS animations still show it.
+    """
+    num_frames = len(frame_durations)
+    if num_frames < 2:
+        return "", ["ascii"] * len(spans)
+
+    starts = [0]
+    for duration in frame_durations:
+        starts.append(starts[-1] + duration)
+    total_duration = starts[-1]
+
+    keyframes = {}
+    delays = set()
+    classes = []
+    for _, _, start, end in spans:
+        if end - start == num_frames:
+            classes.append("ascii")
+            continue
+        visible = starts[end] - starts[start]
+        keyframe = keyframes.setdefault(visible, f"k{len(keyframes)}")
+        delays.add(start)
+        classes.append(f"ascii anim {keyframe} t{start}")
+
+    css = (
+        f".anim {{ opacity: 0; animation-duration: {total_duration:g}s; "
+        "animation-timing-function: step-end; animation-iteration-count: infinite; }\n"
+    )
+    for visible, keyframe in keyframes.items():
+        visible_pct = visible / total_duration * 100
+        css += (
+            f"@keyframes {keyframe} {{ 0% {{ opacity: 1; }} "
+            f"{visible_pct:.3f}%, 100% {{ opacity: 0; }} }}\n"
+            f".{keyframe} {{ animation-name: {keyframe}; }}\n"
         )
+    for start in sorted(delays):
+        css += f".t{start} {{ animation-delay: {starts[start]:g}s; }}\n"
+    # After .anim so it wins; the animation overrides it while running
+    css += ".t0 { opacity: 1; }\n"
 
-
-def wrap_text(text, max_chars):
-    if len(text) <= max_chars:
-        return [text]
-
-    lines = []
-    remaining = text
-
-    while len(remaining) > max_chars:
-        break_point = max_chars
-
-        comma_pos = remaining[:max_chars].rfind(",")
-        if comma_pos > max_chars // 2:
-            break_point = comma_pos + 1
-        else:
-            space_pos = remaining[:max_chars].rfind(" ")
-            if space_pos > max_chars // 3:
-                break_point = space_pos + 1
-
-        lines.append(remaining[:break_point].strip())
-        remaining = remaining[break_point:].strip()
-
-    if remaining:
-        lines.append(remaining)
-
-    return lines
+    return css, classes
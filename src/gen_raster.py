@@ -0,0 +1,344 @@
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .widgets import CHAR_WIDTH
+
+# Regular/bold monospace fonts, first existing pair wins
+FONT_CANDIDATES = [
+    (os.getenv("PROFILE_FONT"), os.getenv("PROFILE_FONT_BOLD")),
+    ("resources/fonts/FiraCode-Regular.ttf", "resources/fonts/FiraCode-Bold.ttf"),
+    (
+        "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSansMono-Bold.ttf",
+    ),
+    ("/System/Library/Fonts/Menlo.ttc", None),
+    ("C:/Windows/Fonts/consola.ttf", "C:/Windows/Fonts/consolab.ttf"),
+]
+
+# Pre-rasterized glyphs, one PNG strip + character index per font variant
+GLYPH_CACHE_DIR = os.path.join("cache", "glyphs")
+# Printable ASCII plus the block characters used by the ASCII art
+ATLAS_PRELOAD = "".join(chr(code) for code in range(32, 127)) + "█▓▒░"
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+# The layout places characters CHAR_WIDTH apart at this font size; fonts are
+# scaled down so their advance fits that grid
+LAYOUT_FONT_SIZE = 13
+
+
+class GlyphAtlas:
+    """
+    Glyph masks for one font size and weight, rendered once with ImageDraw and
+    persisted in GLYPH_CACHE_DIR. Text is drawn by pasting these masks.
+    """
+
+    def __init__(self, font_size, bold=False):
+        regular_path, bold_path = find_font()
+        path = bold_path if bold and bold_path else regular_path
+        # Without a bold face the regular one is drawn twice, one pixel apart
+        self.fake_bold = bold and not bold_path
+
+        self.advance = font_size * CHAR_WIDTH / LAYOUT_FONT_SIZE
+        self.font, font_name = load_font(path, font_size)
+        natural_advance = self.font.getlength("M")
+        if natural_advance > self.advance:
+            render_size = font_size * self.advance / natural_advance
+            self.font, _ = load_font(path, render_size)
+
+        ascent, descent = self.font.getmetrics()
+        self.ascent = ascent
+        cell_width = int(self.font.getlength("M")) + 1
+        self.cell = (cell_width + (1 if self.fake_bold else 0), ascent + descent)
+
+        suffix = "-fakebold" if self.fake_bold else ""
+        self.cache_base = os.path.join(
+            GLYPH_CACHE_DIR, f"{font_name}-{font_size}{suffix}"
+        )
+        self.glyphs = {}
+        self.dirty = False
+        self.load()
+
+        for char in ATLAS_PRELOAD:
+            self.glyph(char)
+
+    def glyph(self, char):
+        mask = self.glyphs.get(char)
+        if mask is None:
+            mask = Image.new("L", self.cell, 0)
+            draw = ImageDraw.Draw(mask)
+            draw.text((0, 0), char, fill=255, font=self.font)
+            if self.fake_bold:
+                draw.text((1, 0), char, fill=255, font=self.font)
+            self.glyphs[char] = mask
+            self.dirty = True
+        return mask
+
+    def load(self):
+        index_file = f"{self.cache_base}.json"
+        strip_file = f"{self.cache_base}.png"
+        if not (os.path.exists(index_file) and os.path.exists(strip_file)):
+            return
+
+        with open(index_file, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if tuple(index["cell"]) != self.cell:
+            return
+
+        strip = Image.open(strip_file)
+        strip.load()
+        width, height = self.cell
+        for i, char in enumerate(index["chars"]):
+            self.glyphs[char] = strip.crop((i * width, 0, (i + 1) * width, height))
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        chars = list(self.glyphs)
+        width, height = self.cell
+        strip = Image.new("L", (width * len(chars), height), 0)
+        for i, char in enumerate(chars):
+            strip.paste(self.glyphs[char], (i * width, 0))
+
+        os.makedirs(GLYPH_CACHE_DIR, exist_ok=True)
+        strip.save(f"{self.cache_base}.png")
+        with open(f"{self.cache_base}.json", "w", encoding="utf-8") as f:
+            json.dump({"cell": list(self.cell), "chars": chars}, f, ensure_ascii=False)
+        self.dirty = False
+
+
+def load_font(path, size):
+    if path:
+        return (
+            ImageFont.truetype(path, size),
+            os.path.splitext(os.path.basename(path))[0],
+        )
+    return ImageFont.load_default(size), "default"
+
+
+def find_font():
+    for regular_path, bold_path in FONT_CANDIDATES:
+        if regular_path and os.path.exists(regular_path):
+            if bold_path and not os.path.exists(bold_path):
+                bold_path = None
+            return regular_path, bold_path
+    return None, None
+
+
+def generate_raster(svg_path, animated=False):
+    """
+    Renders a generated profile SVG to PNG (first slideshow frame), reusing its
+    layout, styles and slideshow timeline. With animated=True an animated WebP
+    with one image per slideshow frame is written as well.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    root = ET.parse(svg_path).getroot()
+    styles, timeline = parse_styles(root)
+
+    width = int(float(root.get("width").rstrip("px")))
+    height = int(float(root.get("height").rstrip("px")))
+
+    # Transparent like the SVG outside the rounded background
+    base = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    background = root.find(f"{SVG_NS}rect")
+    if background is not None:
+        radius = int(float(background.get("rx", 0)))
+        ImageDraw.Draw(base).rounded_rectangle(
+            (0, 0, width - 1, height - 1), radius, fill=background.get("fill")
+        )
+
+    atlases = {}
+    static_items = []
+    animated_items = []
+    collect_items(root, 0, 0, styles, timeline, static_items, animated_items)
+
+    draw = ImageDraw.Draw(base)
+    for item in static_items:
+        if "rects" in item:
+            for x, y, rect_width, rect_height in item["rects"]:
+                draw.rectangle(
+                    (x, y, x + rect_width - 1, y + rect_height - 1), fill=item["fill"]
+                )
+        else:
+            draw_text_item(base, item, atlases)
+
+    base_name = os.path.splitext(svg_path)[0]
+    written = [f"{base_name}.png"]
+
+    frame_times = sorted({item["start"] for item in animated_items}) or [0]
+    first_frame = base.copy()
+    for item in animated_items:
+        if is_visible(item, frame_times[0], timeline):
+            draw_text_item(first_frame, item, atlases)
+    first_frame.save(written[0], optimize=True)
+
+    if animated and len(frame_times) > 1:
+        frames = [first_frame]
+        for frame_time in frame_times[1:]:
+            frame = base.copy()
+            for item in animated_items:
+                if is_visible(item, frame_time, timeline):
+                    draw_text_item(frame, item, atlases)
+            frames.append(frame)
+
+        boundaries = frame_times + [timeline["total"]]
+        durations = [
+            int((boundaries[i + 1] - boundaries[i]) * 1000)
+            for i in range(len(frame_times))
+        ]
+        written.append(f"{base_name}.webp")
+        frames[0].save(
+            written[1],
+            save_all=True,
+            append_images=frames[1:],
+            duration=durations,
+            loop=0,
+            lossless=True,
+        )
+
+    for atlas in atlases.values():
+        atlas.save()
+
+    print(f"Generated: {', '.join(written)}")
+    return written
+
+
+def parse_styles(root):
+    """
+    Reads the simple CSS the profile uses: per-selector fill/font properties,
+    plus the slideshow timeline (cycle length, keyframe windows, delays).
+    """
+    css = "".join(
+        element.text or ""
+        for element in root.iter()
+        if element.tag.replace(SVG_NS, "") == "style"
+    )
+
+    timeline = {"total": 0, "keyframes": {}}
+    for name, pct in re.findall(
+        r"@keyframes\s+([\w-]+)\s*\{\s*0%\s*\{[^}]*\}\s*([\d.]+)%", css
+    ):
+        timeline["keyframes"][name] = float(pct)
+    css = re.sub(r"@keyframes[^{]*\{(?:[^{}]*\{[^}]*\})*[^}]*\}", "", css)
+
+    styles = {}
+    for selector, body in re.findall(r"([.\w-]+)\s*\{([^}]*)\}", css):
+        properties = {}
+        for declaration in body.split(";"):
+            if ":" in declaration:
+                prop, value = declaration.split(":", 1)
+                properties[prop.strip()] = value.strip()
+        styles[selector] = properties
+
+    duration = styles.get(".anim", {}).get("animation-duration", "0s")
+    timeline["total"] = float(duration.rstrip("s") or 0)
+    return styles, timeline
+
+
+def resolve_style(styles, classes, parent=None):
+    style = dict(parent or styles.get("text", {}))
+    for class_name in classes:
+        style.update(styles.get(f".{class_name}", {}))
+    return style
+
+
+def collect_items(
+    element, offset_x, offset_y, styles, timeline, static_items, animated_items
+):
+    """
+    Walks the tree applying translate() offsets and collects text runs and
+    rectangle paths (the heatmap's "M x y h w v h h -w z" cells).
+    """
+    transform = element.get("transform", "")
+    match = re.match(r"translate\(\s*([-\d.]+)[\s,]*([-\d.]+)?\s*\)", transform)
+    if match:
+        offset_x += float(match.group(1))
+        offset_y += float(match.group(2) or 0)
+
+    for child in element:
+        tag = child.tag.replace(SVG_NS, "")
+        if tag == "path":
+            style = resolve_style(styles, child.get("class", "").split())
+            rects = [
+                (
+                    offset_x + float(x),
+                    offset_y + float(y),
+                    float(width),
+                    float(height),
+                )
+                for x, y, width, height in re.findall(
+                    r"M\s*([-\d.]+)[\s,]+([-\d.]+)\s*h\s*([-\d.]+)\s*v\s*([-\d.]+)",
+                    child.get("d", ""),
+                )
+            ]
+            fill = child.get("fill") or style.get("fill", "#000000")
+            static_items.append({"rects": rects, "fill": fill})
+            continue
+        if tag != "text":
+            collect_items(
+                child,
+                offset_x,
+                offset_y,
+                styles,
+                timeline,
+                static_items,
+                animated_items,
+            )
+            continue
+
+        classes = child.get("class", "").split()
+        style = resolve_style(styles, classes)
+        runs = []
+        if child.text:
+            runs.append((child.text, style))
+        for tspan in child:
+            tspan_style = resolve_style(styles, tspan.get("class", "").split(), style)
+            if tspan.get("fill"):
+                tspan_style["fill"] = tspan.get("fill")
+            runs.append((tspan.text or "", tspan_style))
+            if tspan.tail:
+                runs.append((tspan.tail, style))
+
+        item = {
+            "x": offset_x + float(child.get("x", 0)),
+            "y": offset_y + float(child.get("y", 0)),
+            "runs": runs,
+        }
+        if "animation-name" in style:
+            item["keyframe"] = style["animation-name"]
+            item["start"] = float(style.get("animation-delay", "0s").rstrip("s"))
+            animated_items.append(item)
+        else:
+            static_items.append(item)
+
+
+def is_visible(item, frame_time, timeline):
+    visible = timeline["keyframes"].get(item["keyframe"], 0) / 100 * timeline["total"]
+    return item["start"] <= frame_time < item["start"] + visible - 1e-6
+
+
+def draw_text_item(image, item, atlases):
+    """Pastes cached glyph masks for every character of a text item."""
+    x = item["x"]
+    for text, style in item["runs"]:
+        font_size = int(float(style.get("font-size", "13px").rstrip("px")))
+        bold = style.get("font-weight") == "bold"
+        atlas = atlases.get((font_size, bold))
+        if atlas is None:
+            atlas = atlases[(font_size, bold)] = GlyphAtlas(font_size, bold)
+
+        spacing = float(style.get("letter-spacing", "0px").rstrip("px"))
+        fill = style.get("fill", "#000000")
+        top = int(round(item["y"] - atlas.ascent))
+
+        for char in text:
+            if char != " ":
+                image.paste(fill, (int(round(x)), top), atlas.glyph(char))
+            x += atlas.advance + spacing
@@ -1,11 +1,48 @@
+import bisect
+import datetime
 import hashlib
+import json
 import os
+import queue
+import threading
+import time
 
 import requests
 
 # --- CONFIGURATION ---
 CACHE_DIR = "cache"
-GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+# Overridable so the fetchers can be pointed at a local stand-in server
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+
+# LOC strategies: "graphql" walks commit history, "contributors" uses the
+# REST contributor statistics (one request per repo)
+LOC_STRATEGY = os.getenv("LOC_STRATEGY", "graphql")
+# GitHub reports zero additions/deletions for repos at or above this size
+CONTRIBUTOR_STATS_COMMIT_LIMIT = 10000
+CONTRIBUTOR_STATS_RETRIES = 5
+CONTRIBUTOR_STATS_DELAY = 2  # seconds, multiplied by the attempt number
+
+# Parallel LOC recalculation while repository pages are still being fetched
+LOC_WORKERS = int(os.getenv("LOC_WORKERS", "2"))
+LOC_QUEUE_DEPTH = 16
+
+# Contribution heatmap: weeks shown and number of non-empty intensity levels
+HEATMAP_WEEKS = 53
+HEATMAP_LEVELS = 4
+
+# Language breakdown: languages fetched per repo, shown in the widget, and
+# which owned repos are left out of the totals
+LANGUAGES_PER_REPO = 10
+LANGUAGES_SHOWN = 5
+LANGUAGES_SKIP_FORKS = True
+LANGUAGES_SKIP_ARCHIVED = False
+
+# Long history walks persist their cursor every N pages so they can resume
+CHECKPOINT_INTERVAL = 10
+PAGE_RETRIES = 3
+# Cache marker for repos whose LOC walk did not finish
+INCOMPLETE_COMMITS = -1
 
 
 def get_github_stats(username, token):
@@ -13,11 +50,13 @@ def get_github_stats(username, token):
     Fetches GitHub statistics for a given user using GraphQL API.
 
     Includes:
-    - Repository count
+    - Repository count, plus forks, archived, private and collaborator repos
     - Total stars
     - Total commits (last year)
     - Followers
     - Lines of Code (LOC) with caching mechanism
+    - Contribution heatmap levels (from the same per-year queries)
+    - Language breakdown (from the repository scan)
     """
     if not token:
         print("Missing GITHUB_TOKEN! Set it in your environment variables.")
@@ -33,22 +72,29 @@ def get_github_stats(username, token):
         # 1. Get user ID and followers
         user_id, _, followers = get_user_id_and_followers(username, headers)
 
-        # 2. Get total stars
-        stars = get_total_stars(username, headers)
-
-        # 3. Get total commits (contributions from the last year)
-        commits, total_contributions, other_contributions = get_contribution_stats(
-            username, headers
-        )
-
-        # 4. Count Lines of Code (LOC) - requires local cache for performance
-        loc_stats = count_loc(username, user_id, headers)
-
-        # 5. Get total repository count
-        repos_count = get_repo_count(username, headers)
+        # 2. Get total commits (contributions from the last year)
+        (
+            commits,
+            total_contributions,
+            other_contributions,
+            contribution_days,
+        ) = get_contribution_stats(username, headers)
+
+        # 3. Count Lines of Code (LOC) - requires local cache for performance.
+        # The same repository scan also aggregates stars, repository counts
+        # and language sizes.
+        repo_summary = new_repo_summary(load_language_cache(username))
+        loc_stats = count_loc(username, user_id, headers, summary=repo_summary)
+        save_language_cache(username, repo_summary)
+        stars = repo_summary["stars"]
+        repos_count = repo_summary["owned"]
 
         return {
             "repos": f"{repos_count}",
+            "repos_forks": f"{repo_summary['forks']:,}",
+            "repos_archived": f"{repo_summary['archived']:,}",
+            "repos_private": f"{repo_summary['private']:,}",
+            "repos_collaborator": f"{repo_summary['collaborator']:,}",
             "stars": f"{stars:,}",
             "commits": f"{commits:,}",
             "total_contributions": f"{total_contributions:,}",
@@ -57,6 +103,8 @@ def get_github_stats(username, token):
             "loc_total": f"{loc_stats[2]:,}",
             "loc_add": f"{loc_stats[0]:,}++",
             "loc_del": f"{loc_stats[1]:,}--",
+            "heatmap": build_heatmap(contribution_days),
+            "languages": build_language_stats(repo_summary["languages"]),
         }
 
     except Exception as e:
@@ -84,6 +132,26 @@ def run_query(query, variables, headers):
     raise Exception(f"Query failed: {response.status_code} {response.text}")
 
 
+def run_rest_query(path, headers):
+    """
+    Executes a REST API GET request.
+    Statistics endpoints answer 202 while GitHub computes the result in the
+    background, so those are polled. Returns None if it never becomes ready.
+    """
+    url = f"{GITHUB_API_URL}{path}"
+    for attempt in range(1, CONTRIBUTOR_STATS_RETRIES + 1):
+        response = requests.get(url, headers=headers)
+        if response.status_code == 202:
+            time.sleep(CONTRIBUTOR_STATS_DELAY * attempt)
+            continue
+        if response.status_code == 204:
+            return []
+        if response.status_code == 200:
+            return response.json()
+        raise Exception(f"Request failed: {response.status_code} {response.text}")
+    return None
+
+
 def get_user_id_and_followers(username, headers):
     """Retrieves user ID and total followers count."""
     query = """
@@ -103,38 +171,6 @@ def get_user_id_and_followers(username, headers):
     )
 
 
-def get_repo_count(username, headers):
-    """Retrieves total count of owned repositories."""
-    query = """
-    query($login: String!) {
-        user(login: $login) {
-            repositories(ownerAffiliations: OWNER) { totalCount }
-        }
-    }
-    """
-    data = run_query(query, {"login": username}, headers)
-    return data["data"]["user"]["repositories"]["totalCount"]
-
-
-def get_total_stars(username, headers):
-    """Calculates total stargazers earned across first 100 repositories."""
-    query = """
-    query($login: String!) {
-        user(login: $login) {
-            repositories(first: 100, ownerAffiliations: OWNER, orderBy: {field: STARGAZERS, direction: DESC}) {
-                nodes { stargazers { totalCount } }
-            }
-        }
-    }
-    """
-    data = run_query(query, {"login": username}, headers)
-    stars = sum(
-        node["stargazers"]["totalCount"]
-        for node in data["data"]["user"]["repositories"]["nodes"]
-    )
-    return stars
-
-
 def get_contribution_stats(username, headers):
     years_query = """
     query($login: String!) {
@@ -151,6 +187,15 @@ def get_contribution_stats(username, headers):
     total_commits = 0
     total_contribs = 0
 
+    # Per-year totals and daily counts. Years that had already ended when they
+    # were fetched are final and are not queried again.
+    years_file = os.path.join(CACHE_DIR, f"{username}_contributions.json")
+    cached_years = {}
+    if os.path.exists(years_file):
+        with open(years_file, "r") as f:
+            cached_years = json.load(f)
+    current_year = datetime.datetime.now(datetime.timezone.utc).year
+
     query_per_year = """
     query($login: String!, $from: DateTime!, $to: DateTime!) {
         user(login: $login) {
@@ -158,6 +203,7 @@ def get_contribution_stats(username, headers):
                 totalCommitContributions
                 contributionCalendar {
                     totalContributions
+                    weeks { contributionDays { date contributionCount } }
                 }
             }
         }
@@ -166,38 +212,115 @@ def get_contribution_stats(username, headers):
 
     print(f"Fetching stats for years: {years}...")
 
+    year_stats = {}
     for year in years:
-        start_date = f"{year}-01-01T00:00:00Z"
-        end_date = f"{year}-12-31T23:59:59Z"
-
-        variables = {"login": username, "from": start_date, "to": end_date}
-
-        data = run_query(query_per_year, variables, headers)
-        collection = data["data"]["user"]["contributionsCollection"]
+        cached = cached_years.get(str(year))
+        if cached is not None and cached.get("final"):
+            year_stats[str(year)] = cached
+            commits = cached["commits"]
+            contribs = cached["contributions"]
+            print(f"Year {year}: {commits} commits, {contribs} total contribs (cached)")
+        else:
+            start_date = f"{year}-01-01T00:00:00Z"
+            end_date = f"{year}-12-31T23:59:59Z"
+
+            variables = {"login": username, "from": start_date, "to": end_date}
+
+            data = run_query(query_per_year, variables, headers)
+            collection = data["data"]["user"]["contributionsCollection"]
+
+            commits = collection["totalCommitContributions"]
+            contribs = collection["contributionCalendar"]["totalContributions"]
+            year_stats[str(year)] = {
+                "final": year < current_year,
+                "commits": commits,
+                "contributions": contribs,
+                "days": {
+                    day["date"]: day["contributionCount"]
+                    for week in collection["contributionCalendar"]["weeks"]
+                    for day in week["contributionDays"]
+                },
+            }
 
-        commits = collection["totalCommitContributions"]
-        contribs = collection["contributionCalendar"]["totalContributions"]
+            print(f"Year {year}: {commits} commits, {contribs} total contribs")
 
         total_commits += commits
         total_contribs += contribs
 
-        print(f"Year {year}: {commits} commits, {contribs} total contribs")
-
     other_contribs = total_contribs - total_commits
 
-    return total_commits, total_contribs, other_contribs
+    with open(years_file, "w") as f:
+        json.dump(year_stats, f, sort_keys=True)
+
+    days_by_year = {year: stats["days"] for year, stats in year_stats.items()}
+    return total_commits, total_contribs, other_contribs, days_by_year
+
+
+def build_heatmap(days_by_year, weeks=HEATMAP_WEEKS):
+    """
+    Buckets the last `weeks` weeks of daily contributions into intensity levels.
+
+    Level 0 means no contributions, levels 1..HEATMAP_LEVELS split the non-zero
+    days of the window by quantile, like GitHub's calendar. The window starts
+    on a Sunday so each column is one week.
+
+    Returns:
+        dict: {"start": "YYYY-MM-DD", "levels": "0123..."} with one digit per day.
+    """
+    days = {}
+    for year_days in days_by_year.values():
+        days.update(year_days)
+    if not days:
+        return {"start": None, "levels": ""}
+
+    # Calendars for the current year run to Dec 31, so stop at today
+    end = min(datetime.date.fromisoformat(max(days)), datetime.date.today())
+    days_since_sunday = (end.weekday() + 1) % 7
+    start = end - datetime.timedelta(days=(weeks - 1) * 7 + days_since_sunday)
+
+    counts = [
+        days.get((start + datetime.timedelta(days=i)).isoformat(), 0)
+        for i in range((end - start).days + 1)
+    ]
+
+    # Thresholds are computed once, then each day is a single bisect
+    non_zero = sorted(count for count in counts if count)
+    thresholds = (
+        [
+            non_zero[len(non_zero) * i // HEATMAP_LEVELS]
+            for i in range(1, HEATMAP_LEVELS)
+        ]
+        if non_zero
+        else []
+    )
+    levels = "".join(
+        str(bisect.bisect_right(thresholds, count) + 1) if count else "0"
+        for count in counts
+    )
+
+    return {"start": start.isoformat(), "levels": levels}
 
 
 # --- LINES OF CODE (LOC) CALCULATION ---
 
 
-def count_loc(username, user_id, headers):
+def count_loc(username, user_id, headers, strategy=LOC_STRATEGY, summary=None):
     """
     Iterates through repositories and counts added/deleted lines for the specific user.
     Uses a local cache file to avoid re-calculating historical data for unchanged repos.
+
+    With strategy="contributors" the REST contributor statistics are used, falling
+    back to the GraphQL history walk for large repos or when stats are unavailable.
+
+    If a summary dict (see new_repo_summary) is given, it is filled in from the
+    same scan.
     """
     cache_file = os.path.join(CACHE_DIR, f"{username}_loc_cache.txt")
+    weeks_file = os.path.join(CACHE_DIR, f"{username}_loc_weeks.json")
+    checkpoints_file = os.path.join(CACHE_DIR, f"{username}_loc_checkpoints.json")
     cached_repos = {}
+    cached_weeks = {}
+    checkpoints = {}
 
     if os.path.exists(cache_file):
         with open(cache_file, "r") as f:
@@ -210,57 +333,176 @@ def count_loc(username, user_id, headers):
                         "del": int(parts[3]),
                     }
 
-    repos_data = fetch_all_repos(username, headers)
-
-    total_add = 0
-    total_del = 0
-    new_cache_lines = []
-
-    for repo in repos_data:
-        name = repo["nameWithOwner"]
-        hashed_name = hashlib.sha256(name.encode("utf-8")).hexdigest()
-        curr_commits = (
-            repo["defaultBranchRef"]["target"]["history"]["totalCount"]
-            if repo["defaultBranchRef"]
-            else 0
-        )
+    if strategy == "contributors" and os.path.exists(weeks_file):
+        with open(weeks_file, "r") as f:
+            cached_weeks = json.load(f)
 
-        r_add = 0
-        r_del = 0
+    if os.path.exists(checkpoints_file):
+        with open(checkpoints_file, "r") as f:
+            checkpoints = json.load(f)
 
-        if (
-            hashed_name in cached_repos
-            and cached_repos[hashed_name]["commits"] == curr_commits
-        ):
-            r_add = cached_repos[hashed_name]["add"]
-            r_del = cached_repos[hashed_name]["del"]
-        else:
-            if curr_commits > 0:
-                print(f"Recalculating LOC for: {name}...")
-                r_add, r_del = fetch_repo_loc(name, user_id, headers)
+    checkpoint_lock = threading.Lock()
 
-        total_add += r_add
-        total_del += r_del
-        new_cache_lines.append(f"{hashed_name} {curr_commits} {r_add} {r_del}\n")
+    def save_checkpoints():
+        with open(checkpoints_file, "w") as f:
+            json.dump(checkpoints, f, sort_keys=True)
 
-    with open(cache_file, "w") as f:
-        f.writelines(new_cache_lines)
+    def recalculate(name, hashed_name, curr_commits):
+        print(f"Recalculating LOC for: {name}...")
+        if strategy == "contributors" and curr_commits < CONTRIBUTOR_STATS_COMMIT_LIMIT:
+            loc = fetch_repo_loc_contributors(
+                name, username, headers, cached_weeks, hashed_name, curr_commits
+            )
+            if loc is not None:
+                if loc[2]:
+                    with checkpoint_lock:
+                        checkpoints.pop(hashed_name, None)
+                return loc
+
+        # Only resume walks started at the same history length, otherwise the
+        # saved cursor points into an outdated history and is dropped
+        with checkpoint_lock:
+            checkpoint = checkpoints.get(hashed_name)
+            if checkpoint is not None and checkpoint["commits"] != curr_commits:
+                del checkpoints[hashed_name]
+                checkpoint = None
+        if checkpoint is not None:
+            print(f"Resuming LOC walk for {name} from checkpoint...")
+
+        def on_checkpoint(state):
+            with checkpoint_lock:
+                checkpoints[hashed_name] = dict(state, commits=curr_commits)
+                save_checkpoints()
+
+        r_add, r_del, complete = fetch_repo_loc(
+            name, user_id, headers, checkpoint, on_checkpoint
+        )
+        if complete:
+            with checkpoint_lock:
+                checkpoints.pop(hashed_name, None)
+        return r_add, r_del, complete
+
+    # Repos needing recalculation are handed to workers as soon as their page
+    # lands, so LOC work overlaps with fetching the remaining pages. The bounded
+    # queue keeps at most LOC_QUEUE_DEPTH pending repos in memory, and each
+    # repo's cache line and totals are written as soon as its result is final,
+    # so nothing is kept per repository until the end of the scan.
+    work = queue.Queue(maxsize=LOC_QUEUE_DEPTH)
+    errors = []
+    totals = [0, 0]
+    # Scanned repos that have checkpoints or weekly buckets, for pruning
+    live_keys = set()
+    finish_lock = threading.Lock()
+    new_cache_file = f"{cache_file}.tmp"
+    new_cache = open(new_cache_file, "w")
+
+    def finish(hashed_name, curr_commits, r_add, r_del, complete):
+        if not complete:
+            # Never cache a partial or stale sum as final: keep the last complete
+            # value if there is one, the repo is recalculated on the next run
+            previous = cached_repos.get(hashed_name)
+            if previous is not None:
+                curr_commits = previous["commits"]
+                r_add, r_del = previous["add"], previous["del"]
+            else:
+                curr_commits = INCOMPLETE_COMMITS
+        with finish_lock:
+            totals[0] += r_add
+            totals[1] += r_del
+            new_cache.write(f"{hashed_name} {curr_commits} {r_add} {r_del}\n")
+            if hashed_name in checkpoints or hashed_name in cached_weeks:
+                live_keys.add(hashed_name)
+
+    def worker():
+        while True:
+            job = work.get()
+            if job is None:
+                break
+            name, hashed_name, curr_commits = job
+            try:
+                finish(
+                    hashed_name,
+                    curr_commits,
+                    *recalculate(name, hashed_name, curr_commits),
+                )
+            except Exception as e:
+                errors.append(e)
+
+    workers = [threading.Thread(target=worker) for _ in range(max(1, LOC_WORKERS))]
+    for thread in workers:
+        thread.start()
+
+    scanned = False
+    try:
+        for repo in iter_repos(username, headers):
+            name = repo["nameWithOwner"]
+            hashed_name = hashlib.sha256(name.encode("utf-8")).hexdigest()
+            curr_commits = (
+                repo["defaultBranchRef"]["target"]["history"]["totalCount"]
+                if repo["defaultBranchRef"]
+                else 0
+            )
+            if summary is not None:
+                add_repo_to_summary(summary, repo, username)
+
+            cached = cached_repos.get(hashed_name)
+            if cached is not None and cached["commits"] == curr_commits:
+                finish(hashed_name, curr_commits, cached["add"], cached["del"], True)
+            elif curr_commits > 0:
+                work.put((name, hashed_name, curr_commits))
+            else:
+                finish(hashed_name, curr_commits, 0, 0, True)
+        scanned = True
+    finally:
+        for _ in workers:
+            work.put(None)
+        for thread in workers:
+            thread.join()
+        new_cache.close()
+        # The previous cache stays in place when the scan fails
+        if not scanned or errors:
+            os.remove(new_cache_file)
+
+    if errors:
+        raise errors[0]
+
+    os.replace(new_cache_file, cache_file)
+
+    # Checkpoints of repos that left the scan would never be resumed
+    checkpoints = {key: checkpoints[key] for key in checkpoints if key in live_keys}
+    save_checkpoints()
+
+    if strategy == "contributors":
+        with open(weeks_file, "w") as f:
+            json.dump(
+                {key: cached_weeks[key] for key in cached_weeks if key in live_keys},
+                f,
+                sort_keys=True,
+            )
 
+    total_add, total_del = totals
     return [total_add, total_del, total_add - total_del]
 
 
-def fetch_all_repos(username, headers):
-    """Fetches all repository names and commit counts using pagination."""
-    repos = []
+def iter_repos(username, headers):
+    """Yields repository names and commit counts page by page as they arrive."""
     cursor = None
     while True:
         query = """
-        query($login: String!, $cursor: String) {
+        query($login: String!, $cursor: String, $languages: Int!) {
             user(login: $login) {
                 repositories(first: 60, after: $cursor, ownerAffiliations: [OWNER, COLLABORATOR]) {
                     pageInfo { hasNextPage endCursor }
                     nodes {
                         nameWithOwner
+                        stargazerCount
+                        isFork
+                        isArchived
+                        isPrivate
+                        owner { login }
+                        languages(first: $languages, orderBy: {field: SIZE, direction: DESC}) {
+                            edges { size node { name color } }
+                        }
                         defaultBranchRef {
                             target { ... on Commit { history { totalCount } } }
                         }
@@ -269,20 +511,138 @@ def fetch_all_repos(username, headers):
             }
         }
         """
-        data = run_query(query, {"login": username, "cursor": cursor}, headers)
-        repos.extend(data["data"]["user"]["repositories"]["nodes"])
-        if not data["data"]["user"]["repositories"]["pageInfo"]["hasNextPage"]:
+        variables = {
+            "login": username,
+            "cursor": cursor,
+            "languages": LANGUAGES_PER_REPO,
+        }
+        data = run_query(query, variables, headers)
+        repositories = data["data"]["user"]["repositories"]
+        yield from repositories["nodes"]
+        if not repositories["pageInfo"]["hasNextPage"]:
             break
-        cursor = data["data"]["user"]["repositories"]["pageInfo"]["endCursor"]
-    return repos
+        cursor = repositories["pageInfo"]["endCursor"]
+
+
+def fetch_all_repos(username, headers):
+    """Fetches all repository names and commit counts using pagination."""
+    return list(iter_repos(username, headers))
+
+
+def new_repo_summary(language_cache=None):
+    """
+    Returns an empty accumulator for per-repository aggregates.
+    language_cache maps hashed repo names to {"limit", "languages"} from earlier
+    runs, where limit is the LANGUAGES_PER_REPO the sizes were fetched with.
+    """
+    return {
+        "owned": 0,
+        "stars": 0,
+        "forks": 0,
+        "archived": 0,
+        "private": 0,
+        "collaborator": 0,
+        "languages": {},
+        "language_cache": language_cache or {},
+        "language_seen": set(),
+    }
+
+
+def add_repo_to_summary(summary, repo, username):
+    """Adds a repository node from the scan to the summary aggregates."""
+    if repo["owner"]["login"].lower() != username.lower():
+        summary["collaborator"] += 1
+        return
+
+    summary["owned"] += 1
+    summary["stars"] += repo["stargazerCount"]
+    summary["forks"] += repo["isFork"]
+    summary["archived"] += repo["isArchived"]
+    summary["private"] += repo["isPrivate"]
+
+    if (LANGUAGES_SKIP_FORKS and repo["isFork"]) or (
+        LANGUAGES_SKIP_ARCHIVED and repo["isArchived"]
+    ):
+        return
+
+    # The scan's fresh sizes always win; the cache only covers nodes whose
+    # languages could not be resolved (null) in this response
+    hashed_name = hashlib.sha256(repo["nameWithOwner"].encode("utf-8")).hexdigest()
+    if repo.get("languages") is not None:
+        cached = {
+            "limit": LANGUAGES_PER_REPO,
+            "languages": {
+                edge["node"]["name"]: [edge["size"], edge["node"]["color"]]
+                for edge in repo["languages"]["edges"]
+            },
+        }
+        summary["language_cache"][hashed_name] = cached
+    else:
+        cached = summary["language_cache"].get(hashed_name)
+        if cached is None or cached.get("limit") != LANGUAGES_PER_REPO:
+            return
+    summary["language_seen"].add(hashed_name)
+
+    for name, (size, color) in cached["languages"].items():
+        total = summary["languages"].setdefault(name, [0, color])
+        total[0] += size
+
+
+def load_language_cache(username):
+    cache_file = os.path.join(CACHE_DIR, f"{username}_languages.json")
+    if os.path.exists(cache_file):
+        with open(cache_file, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def save_language_cache(username, summary):
+    """Stores the language cache, dropping repos that were not in this scan."""
+    cache_file = os.path.join(CACHE_DIR, f"{username}_languages.json")
+    cache = {
+        key: value
+        for key, value in summary["language_cache"].items()
+        if key in summary["language_seen"]
+    }
+    with open(cache_file, "w") as f:
+        json.dump(cache, f, sort_keys=True)
 
 
-def fetch_repo_loc(repo_name, user_id, headers):
-    """Fetches additions and deletions for a specific user in a repository."""
+def build_language_stats(languages, shown=LANGUAGES_SHOWN):
+    """
+    Turns {name: [bytes, color]} into the widget's [name, percent, color] list,
+    largest first, with everything past `shown` merged into "Other".
+    """
+    total = sum(size for size, _ in languages.values())
+    if not total:
+        return []
+
+    ranked = sorted(languages.items(), key=lambda entry: -entry[1][0])
+    result = [
+        [name, round(size / total * 100, 1), color]
+        for name, (size, color) in ranked[:shown]
+    ]
+    other = sum(size for _, (size, _) in ranked[shown:])
+    if other:
+        result.append(["Other", round(other / total * 100, 1), None])
+    return result
+
+
+def fetch_repo_loc(repo_name, user_id, headers, checkpoint=None, on_checkpoint=None):
+    """
+    Fetches additions and deletions for a specific user in a repository.
+
+    The walk starts from checkpoint ({"cursor", "add", "del"}) when given.
+    on_checkpoint is called with the same shape of state every
+    CHECKPOINT_INTERVAL pages and when a page keeps failing.
+    Returns (additions, deletions, complete).
+    """
     owner, name = repo_name.split("/")
-    additions = 0
-    deletions = 0
-    cursor = None
+    checkpoint = checkpoint or {}
+    additions = checkpoint.get("add", 0)
+    deletions = checkpoint.get("del", 0)
+    cursor = checkpoint.get("cursor")
+    pages = 0
 
     while True:
         query = """
@@ -305,35 +665,101 @@ def fetch_repo_loc(repo_name, user_id, headers):
             }
         }
         """
-        try:
-            data = run_query(
-                query, {"owner": owner, "name": name, "cursor": cursor}, headers
-            )
-            history = data["data"]["repository"]["defaultBranchRef"]["target"][
-                "history"
-            ]
-
-            for commit in history["nodes"]:
-                if (
-                    commit["author"]["user"]
-                    and commit["author"]["user"]["id"] == user_id
-                ):
-                    additions += commit["additions"]
-                    deletions += commit["deletions"]
-
-            if not history["pageInfo"]["hasNextPage"]:
+        variables = {"owner": owner, "name": name, "cursor": cursor}
+        for attempt in range(1, PAGE_RETRIES + 1):
+            try:
+                data = run_query(query, variables, headers)
+                history = data["data"]["repository"]["defaultBranchRef"]["target"][
+                    "history"
+                ]
                 break
-            cursor = history["pageInfo"]["endCursor"]
-        except Exception:
-            break
+            except Exception as e:
+                if attempt == PAGE_RETRIES:
+                    print(f"LOC walk for {repo_name} interrupted: {e}")
+                    if on_checkpoint:
+                        on_checkpoint(
+                            {"cursor": cursor, "add": additions, "del": deletions}
+                        )
+                    return additions, deletions, False
+                time.sleep(attempt)
+
+        for commit in history["nodes"]:
+            if commit["author"]["user"] and commit["author"]["user"]["id"] == user_id:
+                additions += commit["additions"]
+                deletions += commit["deletions"]
+
+        if not history["pageInfo"]["hasNextPage"]:
+            return additions, deletions, True
+        cursor = history["pageInfo"]["endCursor"]
+
+        pages += 1
+        if on_checkpoint and pages % CHECKPOINT_INTERVAL == 0:
+            on_checkpoint({"cursor": cursor, "add": additions, "del": deletions})
+
+
+def fetch_repo_loc_contributors(
+    repo_name, username, headers, cached_weeks, cache_key, curr_commits
+):
+    """
+    Fetches additions and deletions for a user from the contributor statistics
+    endpoint and stores the user's weekly buckets in cached_weeks[cache_key].
+
+    The endpoint returns the full history on every call, so the stored buckets
+    are replaced, not merged. When the statistics are unavailable (202 or
+    error) the stored buckets are used instead, and the result is reported as
+    incomplete so the repo is retried on the next run.
+    Returns (additions, deletions, complete), or None when neither is available.
+    """
+    try:
+        contributors = run_rest_query(f"/repos/{repo_name}/stats/contributors", headers)
+    except Exception as e:
+        print(f"Contributor stats failed for {repo_name}: {e}")
+        contributors = None
+    else:
+        if contributors is None:
+            print(f"Contributor stats still computing for {repo_name}.")
+
+    if contributors is None:
+        entry = cached_weeks.get(cache_key)
+        if entry is None:
+            print(f"No cached contributor stats for {repo_name}, falling back.")
+            return None
+        print(f"Using cached contributor stats for {repo_name}.")
+        complete = False
+    else:
+        weeks = []
+        for contributor in contributors:
+            author = contributor.get("author") or {}
+            if (author.get("login") or "").lower() == username.lower():
+                weeks = contributor["weeks"]
+                break
+
+        entry = {"commits": curr_commits, "weeks": weekly_buckets(weeks)}
+        cached_weeks[cache_key] = entry
+        complete = True
+
+    additions = sum(a for a, _ in entry["weeks"].values())
+    deletions = sum(d for _, d in entry["weeks"].values())
+    return additions, deletions, complete
 
-    return additions, deletions
+
+def weekly_buckets(weeks):
+    """Turns weekly {"w", "a", "d"} buckets into a {week: [add, del]} mapping."""
+    return {
+        str(week["w"]): [week["a"], week["d"]]
+        for week in weeks
+        if week["a"] or week["d"]
+    }
 
 
 def mock_stats():
     """Returns fallback values if the API call fails."""
     return {
         "repos": "??",
+        "repos_forks": "??",
+        "repos_archived": "??",
+        "repos_private": "??",
+        "repos_collaborator": "??",
         "stars": "??",
         "commits": "??",
         "followers": "??",
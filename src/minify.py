@@ -0,0 +1,269 @@
+import gzip
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+
+try:
+    import brotli
+except ImportError:  # optional, .br output is skipped without it
+    brotli = None
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+# Numeric attributes that are rounded to COORD_PRECISION decimals
+COORD_ATTRS = ("x", "y", "width", "height", "rx", "ry")
+COORD_PRECISION = 1
+
+# Attribute values that equal the SVG default and can be dropped
+DEFAULT_ATTRS = {
+    "text": {"x": "0", "y": "0"},
+    "tspan": {},
+    "rect": {"x": "0", "y": "0"},
+}
+
+# Presentation attributes inherited by children, safe to move onto a parent <g>
+INHERITED_ATTRS = (
+    "fill",
+    "font-family",
+    "font-size",
+    "font-weight",
+    "letter-spacing",
+    "text-anchor",
+)
+
+# What may follow a class that is a whole selector on its own
+SELECTOR_END = re.compile(r"\s*[,{]")
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+
+def optimize_svg(svg_path):
+    """
+    Writes a minified copy of svg_path (<name>.min.svg) plus .svgz, .svg.gz and
+    (when brotli is installed) .svg.br precompressed siblings, and reports sizes
+    and XML parse time before and after.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    with open(svg_path, "r", encoding="utf-8") as f:
+        original = f.read()
+
+    minified = minify_svg(original)
+
+    base = os.path.splitext(svg_path)[0] + ".min"
+    written = [f"{base}.svg", f"{base}.svgz", f"{base}.svg.gz"]
+    data = minified.encode("utf-8")
+
+    with open(f"{base}.svg", "wb") as f:
+        f.write(data)
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    for path in written[1:]:
+        with open(path, "wb") as f:
+            f.write(compressed)
+
+    sizes = (
+        f"{len(original.encode('utf-8')):,} B -> {len(data):,} B, "
+        f"gz {len(compressed):,} B"
+    )
+    if brotli is not None:
+        compressed_br = brotli.compress(data, quality=11)
+        with open(f"{base}.svg.br", "wb") as f:
+            f.write(compressed_br)
+        written.append(f"{base}.svg.br")
+        sizes += f", br {len(compressed_br):,} B"
+
+    # Browser render time can't be measured here; XML parse time is the proxy
+    before = measure_parse(original)
+    after = measure_parse(minified)
+    print(f"Minified: {svg_path} ({sizes}; parse {before:.2f} ms -> {after:.2f} ms)")
+
+    return written
+
+
+def minify_svg(svg_text):
+    """Returns a minified version of an SVG document."""
+    root = ET.fromstring(svg_text)
+
+    classes = {}
+    for element in root.iter():
+        strip_whitespace(element)
+        round_coordinates(element)
+        drop_default_attrs(element)
+        for class_name in element.get("class", "").split():
+            classes[class_name] = classes.get(class_name, 0) + 1
+
+    hoist_attributes(root)
+    hoisted = hoist_classes(root, classes, style_text(root))
+
+    # Most frequent classes get the shortest names
+    renames = {
+        class_name: short_name(i)
+        for i, class_name in enumerate(
+            sorted(classes, key=lambda name: (-classes[name], name))
+        )
+    }
+    for element in root.iter():
+        if element.get("class"):
+            element.set(
+                "class",
+                " ".join(renames[name] for name in element.get("class").split()),
+            )
+        if local_name(element.tag) == "style" and element.text:
+            element.text = minify_css(element.text, renames, hoisted)
+
+    return ET.tostring(root, encoding="unicode", short_empty_elements=True)
+
+
+def minify_css(css, renames, hoisted=()):
+    """
+    Collapses whitespace and renames class selectors, leaving url(...) untouched.
+    Selectors of hoisted classes become ".name>*" so they still match the
+    children the class was moved away from.
+    """
+    parts = re.split(r"(url\([^)]*\))", css)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r"\s+", " ", parts[i])
+        part = re.sub(r"\s*([{};:,>])\s*", r"\1", part)
+        part = part.replace(";}", "}")
+        parts[i] = re.sub(
+            r"\.([A-Za-z_][\w-]*)",
+            lambda match: "."
+            + renames.get(match.group(1), match.group(1))
+            + (">*" if match.group(1) in hoisted else ""),
+            part,
+        )
+    return "".join(parts).strip()
+
+
+def strip_whitespace(element):
+    # Text content is significant (the ASCII art relies on white-space: pre),
+    # only indentation around structural elements is removed
+    if local_name(element.tag) not in ("text", "tspan", "style"):
+        if element.text and not element.text.strip():
+            element.text = None
+    if element.tail and not element.tail.strip():
+        element.tail = None
+
+
+def round_coordinates(element):
+    for attr in COORD_ATTRS:
+        value = element.get(attr)
+        if value is not None:
+            element.set(attr, re.sub(r"-?\d+\.?\d*", round_number, value))
+
+    transform = element.get("transform")
+    if transform:
+        transform = re.sub(r"-?\d+\.?\d*", round_number, transform)
+        transform = re.sub(r"\s*,\s*|\s+", " ", transform)
+        transform = re.sub(r"translate\((\S+) 0\)", r"translate(\1)", transform)
+        element.set("transform", transform.replace("( ", "(").replace(" )", ")"))
+
+
+def round_number(match):
+    value = round(float(match.group(0)), COORD_PRECISION)
+    return f"{value:g}"
+
+
+def drop_default_attrs(element):
+    for attr, value in DEFAULT_ATTRS.get(local_name(element.tag), {}).items():
+        if element.get(attr) == value:
+            del element.attrib[attr]
+
+
+def hoist_attributes(root):
+    """Moves inherited attributes shared by every child of a <g> onto the group."""
+    for group in root.iter():
+        children = list(group)
+        if local_name(group.tag) != "g" or len(children) < 2:
+            continue
+        for attr in INHERITED_ATTRS:
+            values = {child.get(attr) for child in children}
+            if len(values) == 1 and None not in values and group.get(attr) is None:
+                group.set(attr, values.pop())
+                for child in children:
+                    del child.attrib[attr]
+
+
+def hoist_classes(root, classes, css):
+    """
+    Moves a class shared by every child of a <g> onto the group, e.g. "ascii" on
+    each slideshow line. Only classes used nowhere else, and whose CSS rules use
+    them as plain ".name" selectors, are moved; minify_css then rewrites those
+    selectors to ".name>*". classes holds the usage count of every class.
+
+    Returns:
+        set: Names of the hoisted classes.
+    """
+    hoisted = set()
+    for group in root.iter():
+        children = list(group)
+        if local_name(group.tag) != "g" or len(children) < 2 or group.get("class"):
+            continue
+
+        shared = set(children[0].get("class", "").split())
+        for child in children[1:]:
+            shared &= set(child.get("class", "").split())
+        shared = {
+            name
+            for name in shared
+            if classes[name] == len(children) and plain_selector(css, name)
+        }
+        if not shared:
+            continue
+
+        group.set("class", " ".join(sorted(shared)))
+        classes.update({name: 1 for name in shared})
+        for child in children:
+            remaining = [
+                name for name in child.get("class").split() if name not in shared
+            ]
+            if remaining:
+                child.set("class", " ".join(remaining))
+            else:
+                del child.attrib["class"]
+        hoisted |= shared
+    return hoisted
+
+
+def plain_selector(css, class_name):
+    """Whether every use of .class_name in css is a whole selector on its own."""
+    uses = list(re.finditer(rf"\.{re.escape(class_name)}(?![\w-])", css))
+    return bool(uses) and all(
+        (use.start() == 0 or css[use.start() - 1] in " \t\n{};,")
+        and SELECTOR_END.match(css, use.end())
+        for use in uses
+    )
+
+
+def style_text(root):
+    return "".join(
+        element.text or ""
+        for element in root.iter()
+        if local_name(element.tag) == "style"
+    )
+
+
+def short_name(index):
+    """0 -> a, 25 -> z, 26 -> aa, ..."""
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord("a") + remainder) + name
+    return name
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def measure_parse(svg_text, repeat=20):
+    """Average time to parse the document, in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ET.fromstring(svg_text)
+    return (time.perf_counter() - start) / repeat * 1000
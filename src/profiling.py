@@ -0,0 +1,173 @@
+"""
+Opt-in profiling for main.run, enabled with PROFILE_MODE or --profile.
+
+Modes (comma separated):
+- cpu: samples every thread's stack and writes collapsed stacks for flame
+  graph tools (flamegraph.pl, speedscope, inferno)
+- cprofile: deterministic cProfile run, saved as a .prof file for pstats
+- memory: tracemalloc report of peak memory and top allocation sites per stage
+
+When no mode is set, session() and stage() return a no-op context and the
+profiling modules are never imported.
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+
+PROFILE_DIR = "profile"
+MODES = ("cpu", "cprofile", "memory")
+
+SAMPLE_INTERVAL = 0.005  # seconds
+TOP_ALLOCATIONS = 10
+
+_active = None
+
+
+def parse_modes(value):
+    """Parses "cpu,memory" style settings, falling back to PROFILE_MODE."""
+    if value is None:
+        value = os.getenv("PROFILE_MODE", "")
+    modes = {mode.strip() for mode in value.split(",") if mode.strip()}
+    unknown = modes - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile mode(s): {', '.join(sorted(unknown))}")
+    return modes
+
+
+def session(modes):
+    """Profiles everything run inside it with the given modes."""
+    if not modes:
+        return contextlib.nullcontext()
+    return Profiler(modes)
+
+
+def stage(name):
+    """Marks a pipeline stage for the memory report."""
+    if _active is None or "memory" not in _active.modes:
+        return contextlib.nullcontext()
+    return _active.memory_stage(name)
+
+
+class Profiler:
+    def __init__(self, modes):
+        self.modes = set(modes)
+        self.sampler = None
+        self.cprofile = None
+        self.memory_report = []
+
+    def __enter__(self):
+        global _active
+        _active = self
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+
+        if "memory" in self.modes:
+            import tracemalloc
+
+            tracemalloc.start()
+        if "cprofile" in self.modes:
+            import cProfile
+
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        if "cpu" in self.modes:
+            self.sampler = StackSampler(SAMPLE_INTERVAL)
+            self.sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        _active = None
+
+        if self.sampler is not None:
+            self.sampler.stop()
+            path = os.path.join(PROFILE_DIR, "cpu.collapsed")
+            self.sampler.write_collapsed(path)
+            print(f"Profile: {self.sampler.samples} stack samples written to {path}")
+
+        if self.cprofile is not None:
+            import pstats
+
+            self.cprofile.disable()
+            path = os.path.join(PROFILE_DIR, "cpu.prof")
+            self.cprofile.dump_stats(path)
+            print(f"Profile: cProfile stats written to {path}")
+            pstats.Stats(self.cprofile).sort_stats("cumulative").print_stats(15)
+
+        if "memory" in self.modes:
+            import tracemalloc
+
+            tracemalloc.stop()
+            path = os.path.join(PROFILE_DIR, "memory.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(self.memory_report) + "\n")
+            print(f"Profile: memory report written to {path}")
+
+        return False
+
+    @contextlib.contextmanager
+    def memory_stage(self, name):
+        import tracemalloc
+
+        # The snapshot itself is traced, so the peak is reset after taking it
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+
+            lines = [
+                f"[{name}] {elapsed:.2f} s, peak {peak / 1024:,.1f} KiB, "
+                f"current {current / 1024:,.1f} KiB"
+            ]
+            for diff in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]:
+                lines.append(f"    {diff}")
+            self.memory_report.extend(lines)
+            print("\n".join(lines))
+
+
+class StackSampler:
+    """Pure Python sampling profiler built on sys._current_frames()."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    filename = os.path.basename(code.co_filename)
+                    stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
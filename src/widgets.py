@@ -0,0 +1,484 @@
+"""
+Widgets for the right column of the profile, one per PROFILE_DATA item type.
+
+Each widget measures an item (estimated height, used to center the ASCII art)
+and renders it into a group whose origin is the top of the item. New item types
+are added by decorating a Widget subclass with @register_widget("type").
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import xml.etree.ElementTree as ET
+
+CHAR_WIDTH = 7
+DOT_PREFIX = ". "
+DOT_PREFIX_WIDTH = len(DOT_PREFIX) * CHAR_WIDTH
+
+# Rendered static fragments, keyed by content and code hash, kept across runs
+FRAGMENT_CACHE_FILE = os.path.join("cache", "fragments.json")
+
+# Source file path -> sha256 of its contents, see source_hash
+_source_hashes = {}
+
+WIDGETS = {}
+
+
+def register_widget(item_type):
+    """Class decorator registering a widget for a PROFILE_DATA item type."""
+
+    def decorator(cls):
+        WIDGETS[item_type] = cls()
+        return cls
+
+    return decorator
+
+
+def get_widget(item):
+    try:
+        return WIDGETS[item["type"]]
+    except KeyError:
+        raise ValueError(f"Unknown PROFILE_DATA item type: {item['type']}")
+
+
+class Widget:
+    """Base widget. layout holds max_text_width and row_height."""
+
+    # Widgets showing stats regardless of placeholders (e.g. complex_loc)
+    dynamic = False
+
+    def measure(self, item, layout):
+        """Returns the estimated height of the item in pixels."""
+        return layout["row_height"]
+
+    def render(self, dwg, group, item, stats_data, layout):
+        """Draws the item into group starting at y=0 and returns the height used."""
+        raise NotImplementedError
+
+    def is_static(self, item):
+        """Static items don't depend on stats and can be rendered once and cached."""
+        return not self.dynamic and not has_placeholders(item)
+
+
+def has_placeholders(value):
+    """Whether any string inside an item contains a {placeholder}."""
+    if isinstance(value, str):
+        return "{" in value
+    if isinstance(value, dict):
+        return any(has_placeholders(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(has_placeholders(v) for v in value)
+    return False
+
+
+@register_widget("spacer")
+class SpacerWidget(Widget):
+    def measure(self, item, layout):
+        return item.get("height", 10)
+
+    def render(self, dwg, group, item, stats_data, layout):
+        return item.get("height", 10)
+
+
+@register_widget("header")
+class HeaderWidget(Widget):
+    def render(self, dwg, group, item, stats_data, layout):
+        base_text = item["text"].rstrip("-").rstrip()
+        available_chars = int(layout["max_text_width"] / CHAR_WIDTH)
+        dashes_needed = available_chars - len(base_text) - 1
+        header_text = base_text + " " + ("-" * max(0, dashes_needed))
+        group.add(dwg.text(header_text, insert=(0, 0), class_="header"))
+        return layout["row_height"]
+
+
+@register_widget("text")
+class TextWidget(Widget):
+    def measure(self, item, layout):
+        max_chars = int(layout["max_text_width"] / CHAR_WIDTH)
+        return (len(item["text"]) // max_chars + 1) * layout["row_height"]
+
+    def render(self, dwg, group, item, stats_data, layout):
+        max_chars = int((layout["max_text_width"] - DOT_PREFIX_WIDTH) / CHAR_WIDTH)
+        text = item["text"]
+
+        if len(text) > max_chars:
+            lines = wrap_text(text, max_chars)
+        else:
+            lines = [text]
+
+        current_y = 0
+        for i, line in enumerate(lines):
+            if i == 0:
+                group.add(dwg.text(DOT_PREFIX, insert=(0, current_y), class_="dots"))
+            group.add(
+                dwg.text(line, insert=(DOT_PREFIX_WIDTH, current_y), class_="header")
+            )
+            current_y += layout["row_height"]
+        return current_y
+
+
+@register_widget("group")
+class GroupWidget(Widget):
+    def measure(self, item, layout):
+        return len(item["items"]) * layout["row_height"]
+
+    def render(self, dwg, group, item, stats_data, layout):
+        current_y = 0
+        for key, raw_val in item["items"]:
+            val_text = raw_val.format(**stats_data)
+            group.add(dwg.text(DOT_PREFIX, insert=(0, current_y), class_="dots"))
+            lines_used = draw_neofetch_row(
+                dwg,
+                group,
+                key,
+                val_text,
+                DOT_PREFIX_WIDTH,
+                current_y,
+                layout["max_text_width"] - DOT_PREFIX_WIDTH,
+                layout["row_height"],
+            )
+            current_y += layout["row_height"] * lines_used
+        return current_y
+
+
+@register_widget("two_column")
+class TwoColumnWidget(Widget):
+    def measure(self, item, layout):
+        return len(item["rows"]) * layout["row_height"]
+
+    def render(self, dwg, group, item, stats_data, layout):
+        half_width = layout["max_text_width"] // 2 - 10
+
+        current_y = 0
+        for row in item["rows"]:
+            left_key, left_val = row[0]
+            right_key, right_val = row[1]
+
+            left_val_text = left_val.format(**stats_data)
+            right_val_text = right_val.format(**stats_data)
+
+            group.add(dwg.text(DOT_PREFIX, insert=(0, current_y), class_="dots"))
+
+            draw_two_col_item(
+                dwg,
+                group,
+                left_key,
+                left_val_text,
+                DOT_PREFIX_WIDTH,
+                current_y,
+                half_width - DOT_PREFIX_WIDTH,
+                CHAR_WIDTH,
+            )
+
+            group.add(dwg.text("|", insert=(half_width + 5, current_y), class_="dots"))
+
+            draw_two_col_item(
+                dwg,
+                group,
+                right_key,
+                right_val_text,
+                half_width + 20,
+                current_y,
+                half_width,
+                CHAR_WIDTH,
+            )
+
+            current_y += layout["row_height"]
+        return current_y
+
+
+@register_widget("complex_loc")
+class LocWidget(Widget):
+    dynamic = True
+
+    def render(self, dwg, group, item, stats_data, layout):
+        key = item["label"]
+        total = stats_data.get("loc_total", "0")
+        add = stats_data.get("loc_add", "0")
+        dele = stats_data.get("loc_del", "0")
+
+        key_pixel_width = (len(key) + 1) * CHAR_WIDTH
+
+        value_text = f"{total} ( {add}, {dele} )"
+        val_pixel_width = len(value_text) * CHAR_WIDTH
+        val_start_x = layout["max_text_width"] - val_pixel_width
+
+        group.add(dwg.text(DOT_PREFIX, insert=(0, 0), class_="dots"))
+        group.add(dwg.text(f"{key}:", insert=(DOT_PREFIX_WIDTH, 0), class_="key"))
+
+        space_for_dots = val_start_x - DOT_PREFIX_WIDTH - key_pixel_width - 5
+        if space_for_dots > 0:
+            num_dots = int(space_for_dots / CHAR_WIDTH)
+            group.add(
+                dwg.text(
+                    "." * num_dots,
+                    insert=(DOT_PREFIX_WIDTH + key_pixel_width, 0),
+                    class_="dots",
+                )
+            )
+
+        val_group = dwg.text("", insert=(val_start_x, 0))
+        val_group.add(dwg.tspan(f"{total} "))
+        val_group.add(dwg.tspan("( "))
+        val_group.add(dwg.tspan(f"{add}", class_="plus"))
+        val_group.add(dwg.tspan(", "))
+        val_group.add(dwg.tspan(f"{dele}", class_="minus"))
+        val_group.add(dwg.tspan(" )"))
+        group.add(val_group)
+
+        return layout["row_height"]
+
+
+@register_widget("heatmap")
+class HeatmapWidget(Widget):
+    """
+    Contribution calendar from stats_data["heatmap"] (see build_heatmap), one
+    column per week. Drawn as one path per intensity level, not one rect per day.
+    """
+
+    dynamic = True
+    cell_size = 8
+    cell_gap = 2
+
+    def measure(self, item, layout):
+        return 7 * (self.cell_size + self.cell_gap) + item.get("padding", 10)
+
+    def render(self, dwg, group, item, stats_data, layout):
+        heatmap = stats_data.get("heatmap") or {}
+        levels = heatmap.get("levels", "")
+        pitch = self.cell_size + self.cell_gap
+        # Text rows are positioned by baseline, so the grid starts above it
+        top = -layout["row_height"] // 2 - 2
+
+        paths = {}
+        for day, level in enumerate(levels):
+            x = (day // 7) * pitch
+            y = top + (day % 7) * pitch
+            paths.setdefault(level, []).append(
+                f"M{x} {y}h{self.cell_size}v{self.cell_size}h-{self.cell_size}z"
+            )
+
+        for level in sorted(paths):
+            group.add(dwg.path(d="".join(paths[level]), class_=f"heat{level}"))
+
+        return self.measure(item, layout)
+
+
+@register_widget("languages")
+class LanguagesWidget(Widget):
+    """
+    Stacked bar of stats_data["languages"] ([name, percent, color] entries, see
+    build_language_stats) with a legend below, `columns` entries per row.
+    """
+
+    dynamic = True
+    bar_height = 8
+    columns = 3
+
+    def measure(self, item, layout):
+        return self.bar_height + item.get("legend_rows", 2) * layout["row_height"]
+
+    def render(self, dwg, group, item, stats_data, layout):
+        languages = stats_data.get("languages") or []
+        width = layout["max_text_width"]
+        top = -layout["row_height"] // 2 - 2
+
+        x = 0
+        for i, (name, percent, color) in enumerate(languages):
+            # The last segment absorbs rounding so the bar is always full width
+            segment = width - x if i == len(languages) - 1 else width * percent / 100
+            segment = round(segment, 1)
+            path = f"M{round(x, 1)} {top}h{segment}v{self.bar_height}h-{segment}z"
+            if color:
+                group.add(dwg.path(d=path, fill=color))
+            else:
+                group.add(dwg.path(d=path, class_="dots"))
+            x += segment
+
+        column_width = width // self.columns
+        legend_y = top + self.bar_height + layout["row_height"]
+        for i, (name, percent, color) in enumerate(languages):
+            row, column = divmod(i, self.columns)
+            entry = dwg.text(
+                "",
+                insert=(column * column_width, legend_y + row * layout["row_height"]),
+            )
+            if color:
+                entry.add(dwg.tspan("■ ", fill=color))
+            else:
+                entry.add(dwg.tspan("■ ", class_="dots"))
+            entry.add(dwg.tspan(f"{name} ", class_="header"))
+            entry.add(dwg.tspan(f"{percent}%"))
+            group.add(entry)
+
+        rows = -(-len(languages) // self.columns)
+        return self.bar_height + max(rows, 1) * layout["row_height"]
+
+
+# --- FRAGMENT CACHE ---
+
+
+class CachedFragment:
+    """A pre-rendered <g> inserted into an svgwrite drawing as raw XML."""
+
+    elementname = "g"
+
+    def __init__(self, xml, y):
+        self.xml = xml
+        self.y = y
+
+    def get_xml(self):
+        element = ET.fromstring(self.xml)
+        if self.y:
+            element.set("transform", f"translate(0, {self.y})")
+        return element
+
+
+def load_fragment_cache():
+    if os.path.exists(FRAGMENT_CACHE_FILE):
+        with open(FRAGMENT_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_fragment_cache(fragments):
+    os.makedirs(os.path.dirname(FRAGMENT_CACHE_FILE), exist_ok=True)
+    with open(FRAGMENT_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(fragments, f, ensure_ascii=False, sort_keys=True)
+
+
+def fragment_key(widget, item, layout):
+    """
+    Hashes the item and layout together with the code that renders it (this
+    module and the module defining the widget), so cached fragments are redrawn
+    whenever the rendering code changes.
+    """
+    code = [source_hash(__file__), source_hash(inspect.getfile(type(widget)))]
+    payload = json.dumps([code, item, layout], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def source_hash(path):
+    digest = _source_hashes.get(path)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = _source_hashes[path] = hashlib.sha256(f.read()).hexdigest()
+    return digest
+
+
+def render_item(dwg, item, stats_data, layout, y, fragments, used_keys):
+    """
+    Renders an item placed at y and returns (element, height). The element is
+    None for items that draw nothing, like spacers.
+
+    Static items are looked up in (and added to) fragments by fragment_key, so
+    they are only drawn once across themes and runs; the keys that were used are
+    collected in used_keys.
+    """
+    widget = get_widget(item)
+
+    if not widget.is_static(item):
+        group = dwg.g(transform=f"translate(0, {y})") if y else dwg.g()
+        height = widget.render(dwg, group, item, stats_data, layout)
+        return (group if group.elements else None), height
+
+    key = fragment_key(widget, item, layout)
+    if key not in fragments:
+        group = dwg.g()
+        height = widget.render(dwg, group, item, stats_data, layout)
+        xml = (
+            ET.tostring(group.get_xml(), encoding="unicode") if group.elements else None
+        )
+        fragments[key] = [xml, height]
+    used_keys.add(key)
+
+    xml, height = fragments[key]
+    return (CachedFragment(xml, y) if xml else None), height
+
+
+# --- DRAWING HELPERS ---
+
+
+def draw_neofetch_row(dwg, group, key, value, x, y, max_width, row_height=20):
+    """Draws a key-value row with dots in between (neofetch style).
+    Returns the number of rows used (for text wrapping)."""
+    char_width = 7
+    key_pixel_width = (len(key) + 1) * char_width
+
+    available_width = max_width - key_pixel_width - 20
+    max_value_chars = int(available_width / char_width)
+
+    if len(value) > max_value_chars and max_value_chars > 0:
+        lines = wrap_text(value, max_value_chars)
+    else:
+        lines = [value]
+
+    group.add(dwg.text(f"{key}:", insert=(x, y), class_="key"))
+
+    first_line = lines[0]
+    val_pixel_width = len(first_line) * char_width
+    val_start_x = x + max_width - val_pixel_width
+    if val_start_x < x + key_pixel_width + 10:
+        val_start_x = x + key_pixel_width + 10
+
+    group.add(dwg.text(first_line, insert=(val_start_x, y)))
+
+    dot_start = x + key_pixel_width
+    space_for_dots = val_start_x - dot_start - 5
+    if space_for_dots > 0:
+        num_dots = int(space_for_dots / char_width)
+        group.add(dwg.text("." * num_dots, insert=(dot_start, y), class_="dots"))
+
+    for i, line in enumerate(lines[1:], start=1):
+        line_y = y + i * row_height
+        group.add(dwg.text(line, insert=(val_start_x, line_y)))
+
+    return len(lines)
+
+
+def draw_two_col_item(dwg, group, key, value, x, y, width, char_width):
+    key_pixel_width = (len(key) + 1) * char_width
+    val_pixel_width = len(value) * char_width
+
+    group.add(dwg.text(f"{key}:", insert=(x, y), class_="key"))
+
+    val_start_x = x + width - val_pixel_width
+    if val_start_x < x + key_pixel_width + 5:
+        val_start_x = x + key_pixel_width + 5
+
+    group.add(dwg.text(value, insert=(val_start_x, y)))
+
+    space_for_dots = val_start_x - (x + key_pixel_width) - 3
+    if space_for_dots > 0:
+        num_dots = int(space_for_dots / char_width)
+        group.add(
+            dwg.text("." * num_dots, insert=(x + key_pixel_width, y), class_="dots")
+        )
+
+
+def wrap_text(text, max_chars):
+    if len(text) <= max_chars:
+        return [text]
+
+    lines = []
+    remaining = text
+
+    while len(remaining) > max_chars:
+        break_point = max_chars
+
+        comma_pos = remaining[:max_chars].rfind(",")
+        if comma_pos > max_chars // 2:
+            break_point = comma_pos + 1
+        else:
+            space_pos = remaining[:max_chars].rfind(" ")
+            if space_pos > max_chars // 3:
+                break_point = space_pos + 1
+
+        lines.append(remaining[:break_point].strip())
+        remaining = remaining[break_point:].strip()
+
+    if remaining:
+        lines.append(remaining)
+
+    return lines